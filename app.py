@@ -1,10 +1,14 @@
 import streamlit as st
 import asyncio
-import nest_asyncio
+import threading
 from scraper import WhoSampledScraper
 
-# Apply patch for running asyncio within Streamlit
-nest_asyncio.apply()
+try:
+    # libuv-based loop with lower per-await overhead, where available
+    import uvloop
+    new_event_loop = uvloop.new_event_loop
+except ImportError:
+    new_event_loop = asyncio.new_event_loop
 
 st.set_page_config(
     page_title="WhoSampled Explorer",
@@ -15,20 +19,36 @@ st.set_page_config(
 st.title("🎵 WhoSampled Explorer")
 st.markdown("Search for a track to see its samples, covers, and remixes.")
 
-# Initialize Scraper in Session State
-if 'scraper' not in st.session_state:
-    try:
-        # FIX: Removed 'headless=True' argument to resolve the TypeError.
-        # The scraper defaults to headless=True anyway.
-        st.session_state.scraper = WhoSampledScraper()
-        
-        # Optional: Add a brief welcome message to confirm successful basic rendering
-        st.sidebar.caption("Scraper initialized.")
-    except Exception as e:
-        # If initialization fails (e.g., missing dependency, Playwright issue), display the error
-        st.error("Application Initialization Failed. Please check the terminal for errors.")
-        st.exception(e)
-        st.stop()
+# Run all scraper coroutines on one background event loop, shared across reruns,
+# so the scraper's browser stays bound to the loop that created it
+@st.cache_resource
+def get_loop():
+    loop = new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+# Share one scraper, and so one browser, across reruns and sessions.
+# The browser is launched here so a Playwright failure is reported by the
+# initialization error below; a failed launch is not cached and is retried.
+@st.cache_resource
+def get_scraper():
+    scraper = WhoSampledScraper()
+    run_async(scraper._ensure_browser())
+    return scraper
+
+try:
+    get_scraper()
+    
+    # Optional: Add a brief welcome message to confirm successful basic rendering
+    st.sidebar.caption("Scraper initialized.")
+except Exception as e:
+    # If initialization fails (e.g., missing dependency, Playwright issue), display the error
+    st.error("Application Initialization Failed. Please check the terminal for errors.")
+    st.exception(e)
+    st.stop()
         
 if 'current_track' not in st.session_state:
     st.session_state.current_track = None
@@ -41,19 +61,38 @@ with st.sidebar:
     query = st.text_input("Artist & Track Name", placeholder="e.g. Daft Punk One More Time")
     search_btn = st.button("Search", type="primary")
 
-async def perform_search(search_query):
-    with st.spinner(f"Searching for '{search_query}'..."):
-        return await st.session_state.scraper.search_track(search_query)
+class LookupFailed(Exception):
+    """A lookup found nothing or failed, so its result must not be cached."""
+
+def _check_result(result, missing_msg):
+    if not result:
+        raise LookupFailed(missing_msg)
+    if result.get("error"):
+        raise LookupFailed(result["error"])
+    return result
+
+# Streamlit reruns the whole script on every interaction, so memoize lookups
+# to avoid re-scraping the same track. st.cache_data stores nothing when the
+# function raises, so failures are raised and retried on the next attempt.
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_search(search_query):
+    result = run_async(get_scraper().search_track(search_query))
+    return _check_result(result, "No track found for the query.")
 
-async def perform_details_lookup(url):
-    with st.spinner("Fetching samples and YouTube data..."):
-        return await st.session_state.scraper.get_track_details(url)
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_details(url):
+    details = run_async(get_scraper().get_track_details(url))
+    return _check_result(details, "No details found for the track.")
 
 # --- Main Logic ---
 
 if search_btn and query:
     # 1. Search for the track
-    result = asyncio.run(perform_search(query))
+    with st.spinner(f"Searching for '{query}'..."):
+        try:
+            result = cached_search(query)
+        except LookupFailed as e:
+            result = {"error": str(e)}
     
     if result.get("found"):
         st.session_state.current_track = result
@@ -84,9 +123,14 @@ if st.session_state.current_track:
         # Load Details Button (if not already loaded)
         if st.session_state.track_details is None:
             if st.button("Load Connections & Audio"):
-                details = asyncio.run(perform_details_lookup(track['url']))
-                st.session_state.track_details = details
-                st.rerun() # Rerun to update the UI with new data
+                try:
+                    with st.spinner("Fetching samples and YouTube data..."):
+                        details = cached_details(track['url'])
+                except LookupFailed as e:
+                    st.error(f"Could not load connections. Error: {e}")
+                else:
+                    st.session_state.track_details = details
+                    st.rerun() # Rerun to update the UI with new data
         
         # Display YouTube Player if we have the ID
         if st.session_state.track_details:
@@ -3,6 +3,7 @@
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, patch
+from whosampled_connector import cache
 from whosampled_connector.scraper import WhoSampledScraper
 import socket
 
@@ -34,6 +35,16 @@ def skip_if_no_internet(request):
             )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point the cache at a temporary directory for each test."""
+    monkeypatch.setenv("WHOSAMPLED_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache, "_cache", None)
+    yield
+    if cache._cache is not None:
+        cache._cache.close()
+
+
 @pytest_asyncio.fixture
 async def scraper():
     """Create a scraper instance for testing."""
@@ -0,0 +1,130 @@
+"""Tests for the disk cache."""
+
+import pytest
+from whosampled_connector import cache
+from whosampled_connector.cache import (
+    disk_cached,
+    get_or_compute,
+    memory_cached,
+    normalize_query,
+)
+
+
+def test_normalize_query():
+    """Test that case and whitespace differences are normalized away."""
+    assert normalize_query("  Daft Punk  One More Time ") == "daft punk one more time"
+    assert normalize_query("daft punk one more time") == "daft punk one more time"
+
+
+def test_normalize_query_unicode():
+    """Test that compatibility characters and case variants are normalized."""
+    # Full-width letters and ideographic space
+    assert normalize_query("Ｄａｆｔ\u3000Ｐｕｎｋ") == "daft punk"
+    assert normalize_query("STRASSE") == normalize_query("straße")
+
+
+def test_disk_cached_hit_skips_call():
+    """Test that a cached result is returned without calling the function again."""
+    calls = []
+
+    @disk_cached("test", key_func=lambda query: normalize_query(query))
+    def lookup(query):
+        calls.append(query)
+        return {"title": "One More Time"}
+
+    assert lookup("Daft Punk  One More Time") == {"title": "One More Time"}
+    assert lookup("daft punk one more time") == {"title": "One More Time"}
+    assert len(calls) == 1
+
+
+def test_disk_cached_skips_errors():
+    """Test that error results are not cached."""
+    calls = []
+
+    @disk_cached("test", key_func=lambda query: query)
+    def lookup(query):
+        calls.append(query)
+        return {"error": "No track found for the query."}
+
+    lookup("Unknown")
+    lookup("Unknown")
+    assert len(calls) == 2
+
+
+def test_disk_cached_namespaces_are_separate():
+    """Test that the same arguments in different namespaces do not collide."""
+
+    @disk_cached("first", key_func=lambda query: query)
+    def first(query):
+        return {"source": "first"}
+
+    @disk_cached("second", key_func=lambda query: query)
+    def second(query):
+        return {"source": "second"}
+
+    assert first("same") == {"source": "first"}
+    assert second("same") == {"source": "second"}
+
+
+def test_get_or_compute_skips_none():
+    """Test that missing values are recomputed rather than cached."""
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert get_or_compute("youtube", "url", compute) is None
+    assert get_or_compute("youtube", "url", compute) is None
+    assert len(calls) == 2
+
+    assert get_or_compute("youtube", "url", lambda: "gAjR4_CbPpQ") == "gAjR4_CbPpQ"
+    assert get_or_compute("youtube", "url", compute) == "gAjR4_CbPpQ"
+    assert len(calls) == 2
+
+
+def test_get_or_compute_ttl_from_result(monkeypatch):
+    """Test that the TTL can depend on the computed value."""
+    expiries = []
+    store = cache.get_cache()
+    original_set = store.set
+
+    def recording_set(key, value, expire=None):
+        expiries.append(expire)
+        return original_set(key, value, expire=expire)
+
+    monkeypatch.setattr(store, "set", recording_set)
+    ttl = lambda result: 60 if result else 10
+
+    get_or_compute("youtube", "found", lambda: "gAjR4_CbPpQ", ttl=ttl)
+    get_or_compute("youtube", "missing", lambda: "", ttl=ttl)
+
+    assert expiries == [60, 10]
+
+
+def test_memory_cached_evicts_least_recently_used():
+    """Test that the in-process LRU keeps at most maxsize entries."""
+    calls = []
+
+    @memory_cached(key_func=lambda query: query, maxsize=2)
+    def lookup(query):
+        calls.append(query)
+        return {"query": query}
+
+    lookup("a")
+    lookup("b")
+    lookup("a")  # "a" is now most recently used
+    lookup("c")  # evicts "b"
+    lookup("a")
+    lookup("b")
+
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_default_ttl_from_env(monkeypatch):
+    """Test that the TTL can be configured from the environment."""
+    monkeypatch.setenv("WHOSAMPLED_CACHE_TTL", "60")
+    assert cache.default_ttl() == 60
+
+    monkeypatch.setenv("WHOSAMPLED_CACHE_TTL", "invalid")
+    assert cache.default_ttl() == cache.DEFAULT_CACHE_TTL
@@ -1,15 +1,21 @@
 """Tests for WhoSampled scraper."""
 
 import pytest
+from bs4 import BeautifulSoup
 from unittest.mock import AsyncMock, patch
 from whosampled_connector.scraper import WhoSampledScraper
 
 
+def _page(html):
+    """Parse HTML the way _fetch_page returns it."""
+    return BeautifulSoup(html, "lxml")
+
+
 @pytest.mark.asyncio
 async def test_search_track_success(scraper, mock_search_html):
     """Test successful track search."""
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = mock_search_html
+        mock_fetch.return_value = _page(mock_search_html)
 
         result = await scraper.search_track(
             "Daft Punk Harder Better Faster Stronger"
@@ -27,7 +33,7 @@ async def test_search_track_not_found(scraper):
     empty_html = "<html><body></body></html>"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = empty_html
+        mock_fetch.return_value = _page(empty_html)
 
         result = await scraper.search_track("NonexistentArtist NonexistentTrack")
 
@@ -40,7 +46,7 @@ async def test_get_track_details_with_samples(scraper, mock_track_details_html):
     test_url = "https://www.whosampled.com/Daft-Punk/Harder,-Better,-Faster,-Stronger/"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = mock_track_details_html
+        mock_fetch.return_value = _page(mock_track_details_html)
 
         result = await scraper.get_track_details(test_url, include_youtube=False)
 
@@ -61,12 +67,13 @@ async def test_get_track_details_with_youtube(scraper, mock_track_details_html):
     test_url = "https://www.whosampled.com/Daft-Punk/Harder,-Better,-Faster,-Stronger/"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = mock_track_details_html
+        mock_fetch.return_value = _page(mock_track_details_html)
 
         result = await scraper.get_track_details(test_url, include_youtube=True)
 
         assert result is not None
         assert "youtube_url" in result
+        assert result["youtube_id"] == "gAjR4_CbPpQ"
         # Verify proper YouTube URL format: youtube.com/watch?v=... or youtu.be/...
         youtube_url = result["youtube_url"]
         assert "youtube.com/watch" in youtube_url or "youtu.be/" in youtube_url
@@ -81,7 +88,7 @@ async def test_get_track_details_with_covers_and_remixes(
     test_url = "https://www.whosampled.com/Daft-Punk/Harder,-Better,-Faster,-Stronger/"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = mock_track_details_html
+        mock_fetch.return_value = _page(mock_track_details_html)
 
         result = await scraper.get_track_details(test_url, include_youtube=False)
 
@@ -102,7 +109,7 @@ async def test_get_track_details_empty(scraper, mock_empty_track_html):
     test_url = "https://www.whosampled.com/Some/Obscure-Track/"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = mock_empty_track_html
+        mock_fetch.return_value = _page(mock_empty_track_html)
 
         result = await scraper.get_track_details(test_url, include_youtube=False)
 
@@ -130,6 +137,332 @@ async def test_get_track_details_http_error(scraper):
         assert result["url"] == test_url
 
 
+@pytest.mark.asyncio
+async def test_route_request_blocks_unused_resources(scraper):
+    """Test that images and trackers are aborted while documents load."""
+
+    def make_route(url, resource_type):
+        route = AsyncMock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        return route
+
+    image = make_route("https://www.whosampled.com/static/cover.jpg", "image")
+    tracker = make_route("https://www.googletagmanager.com/gtm.js", "script")
+    document = make_route("https://www.whosampled.com/Daft-Punk/", "document")
+
+    for route in (image, tracker, document):
+        await scraper._route_request(route)
+
+    image.abort.assert_called_once()
+    tracker.abort.assert_called_once()
+    document.continue_.assert_called_once()
+    document.abort.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ensure_browser_stops_playwright_on_failure(scraper):
+    """Test that a failed launch stops the playwright driver and can be retried."""
+    playwright = AsyncMock()
+    playwright.chromium.launch.side_effect = Exception("Executable doesn't exist")
+    starter = AsyncMock()
+    starter.start.return_value = playwright
+
+    with patch(
+        "whosampled_connector.scraper.async_playwright", return_value=starter
+    ):
+        with pytest.raises(Exception, match="Executable"):
+            await scraper._ensure_browser()
+
+    playwright.stop.assert_called_once()
+    assert scraper.playwright is None
+    assert not scraper._initialized
+
+
+@pytest.mark.asyncio
+async def test_load_page_waits_for_selector(scraper):
+    """Test that a page is read once the selector appears, without a fixed delay."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    page = AsyncMock()
+    page.content.return_value = "<html></html>"
+    page.wait_for_selector.side_effect = PlaywrightTimeoutError("timeout")
+
+    content = await scraper._load_page(
+        page, "https://www.whosampled.com/search/?q=x", wait_for="a.trackName"
+    )
+
+    # A missing element is not an error, the HTML is still returned
+    assert content == "<html></html>"
+    page.goto.assert_called_once()
+    assert page.goto.call_args.kwargs["wait_until"] == "domcontentloaded"
+    page.wait_for_selector.assert_called_once()
+    assert page.wait_for_selector.call_args.kwargs["state"] == "attached"
+    page.wait_for_timeout.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_and_fetch_details(
+    scraper, mock_search_html, mock_track_details_html
+):
+    """Test searching and getting details in a single scraper call."""
+    with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.side_effect = [_page(mock_search_html), _page(mock_track_details_html)]
+
+        result = await scraper.search_and_fetch_details(
+            "Daft Punk Harder Better Faster Stronger"
+        )
+
+        assert "error" not in result
+        assert result["title"] == "Harder, Better, Faster, Stronger"
+        assert result["artist"] == "Daft Punk"
+        assert result["samples"][0]["track"] == "Cola Bottle Baby"
+        assert result["sampled_by"][0]["artist"] == "Kanye West"
+
+        # The top hit's page is fetched through the same path as other lookups
+        assert mock_fetch.call_args_list[1].args == (result["url"],)
+        assert (
+            mock_fetch.call_args_list[1].kwargs["wait_for"]
+            == scraper.TRACK_READY_SELECTOR
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_and_fetch_details_not_found(scraper):
+    """Test the combined lookup when the search has no results."""
+    with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = _page("<html><body></body></html>")
+
+        result = await scraper.search_and_fetch_details("Unknown Track")
+
+        assert "error" in result
+        assert mock_fetch.call_count == 1
+
+
+def _mock_http_session(status, text=""):
+    """Build a mock aiohttp session whose get() returns the given response."""
+    from unittest.mock import MagicMock
+
+    response = MagicMock()
+    response.status = status
+    response.text = AsyncMock(return_value=text)
+
+    request = MagicMock()
+    request.__aenter__ = AsyncMock(return_value=response)
+    request.__aexit__ = AsyncMock(return_value=False)
+
+    session = MagicMock()
+    session.get.return_value = request
+    return session
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_uses_static_html(scraper, mock_search_html):
+    """Test that server-rendered pages are fetched without the browser."""
+    with (
+        patch.object(scraper, "_ensure_http", new_callable=AsyncMock) as mock_http,
+        patch.object(scraper, "_new_page", new_callable=AsyncMock) as mock_new_page,
+    ):
+        mock_http.return_value = _mock_http_session(200, mock_search_html)
+
+        soup = await scraper._fetch_page(
+            "https://www.whosampled.com/search/?q=x",
+            wait_for=scraper.SEARCH_READY_SELECTOR,
+        )
+
+        assert soup.select_one("a.trackTitle").get_text(strip=True) == (
+            "Harder, Better, Faster, Stronger"
+        )
+        mock_new_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_static_falls_back_when_blocked(scraper):
+    """Test that a blocked static request pauses the fast path for a while."""
+    with (
+        patch.object(scraper, "_ensure_http", new_callable=AsyncMock) as mock_http,
+        patch("whosampled_connector.scraper.time.monotonic") as mock_time,
+    ):
+        mock_http.return_value = _mock_http_session(403)
+        mock_time.return_value = 1000.0
+
+        assert await scraper._fetch_static("https://www.whosampled.com/") is None
+        assert await scraper._fetch_static("https://www.whosampled.com/") is None
+
+        # The second call doesn't make a request
+        assert mock_http.call_count == 1
+
+        # Once the cooldown is over, plain HTTP is tried again
+        mock_http.return_value = _mock_http_session(200, "<html></html>")
+        mock_time.return_value = 1000.0 + scraper.STATIC_BLOCK_COOLDOWN
+        assert await scraper._fetch_static("https://www.whosampled.com/") == (
+            "<html></html>"
+        )
+        assert mock_http.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_falls_back_when_selector_missing(scraper):
+    """Test that pages without the expected content are left to the browser."""
+    rendered = '<html><body><section class="subsection"></section></body></html>'
+
+    with (
+        patch.object(scraper, "_ensure_http", new_callable=AsyncMock) as mock_http,
+        patch.object(scraper, "_new_page", new_callable=AsyncMock) as mock_new_page,
+        patch.object(scraper, "_load_page", new_callable=AsyncMock) as mock_load,
+    ):
+        mock_http.return_value = _mock_http_session(200, "<html><body></body></html>")
+        mock_new_page.return_value = AsyncMock()
+        mock_load.return_value = rendered
+
+        soup = await scraper._fetch_page(
+            "https://www.whosampled.com/Daft-Punk/One-More-Time/",
+            wait_for="section.subsection",
+        )
+
+        assert soup.select_one("section.subsection") is not None
+        mock_load.assert_called_once()
+        assert scraper._static_blocked_until == 0.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_static_falls_back_when_undecodable(scraper):
+    """Test that a body that can't be decoded is left to the browser."""
+    session = _mock_http_session(200)
+    response = session.get.return_value.__aenter__.return_value
+    response.text.side_effect = UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid")
+
+    with patch.object(scraper, "_ensure_http", new_callable=AsyncMock) as mock_http:
+        mock_http.return_value = session
+
+        assert await scraper._fetch_static("https://www.whosampled.com/") is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_limits_concurrency(scraper):
+    """Test that concurrent page fetches are bounded by the semaphore."""
+    import asyncio
+
+    active = 0
+    peak = 0
+
+    async def slow_load(page, url, wait_for=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "<html></html>"
+
+    with (
+        patch.object(scraper, "_fetch_static", new_callable=AsyncMock) as mock_static,
+        patch.object(scraper, "_new_page", new_callable=AsyncMock) as mock_new_page,
+        patch.object(scraper, "_load_page", side_effect=slow_load),
+    ):
+        mock_static.return_value = None
+        mock_new_page.return_value = AsyncMock()
+
+        await asyncio.gather(
+            *(scraper._fetch_page(f"https://www.whosampled.com/{i}/") for i in range(10))
+        )
+
+    assert peak == scraper.MAX_CONCURRENT_FETCHES
+
+
+def _sampled_by_page(start, count, total_pages):
+    """Build a "sampled by" list page with numbered tracks and pagination links."""
+    items = "".join(
+        f'''<div class="trackItem">
+            <a class="trackName" href="/Track-{i}/">Track {i}</a>
+            <span class="trackArtist">by <a href="/Artist-{i}/">Artist {i}</a></span>
+        </div>'''
+        for i in range(start, start + count)
+    )
+    pagination = "".join(
+        f'<a href="?cp={page}">{page}</a>' for page in range(2, total_pages + 1)
+    )
+    return f'<html><body>{items}<div class="pagination">{pagination}</div></body></html>'
+
+
+@pytest.mark.asyncio
+async def test_get_sampled_by_fetches_only_needed_pages(scraper):
+    """Test that only the pages covering the requested window are fetched."""
+    list_url = "https://www.whosampled.com/The-Winstons/Amen,-Brother/sampled/"
+
+    with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.side_effect = [
+            _page(_sampled_by_page(0, 10, total_pages=50)),
+            _page(_sampled_by_page(10, 10, total_pages=50)),
+        ]
+
+        result = await scraper.get_sampled_by(list_url, limit=5, offset=8)
+
+        assert "error" not in result
+        assert result["total_pages"] == 50
+        assert [t["track"] for t in result["sampled_by"]] == [
+            f"Track {i}" for i in range(8, 13)
+        ]
+        assert mock_fetch.call_count == 2
+        assert mock_fetch.call_args_list[1].args[0] == f"{list_url}?cp=2"
+
+
+@pytest.mark.asyncio
+async def test_get_sampled_by_skips_pages_before_offset(scraper):
+    """Test that pages entirely before the window are not fetched."""
+    list_url = "https://www.whosampled.com/The-Winstons/Amen,-Brother/sampled/"
+
+    with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.side_effect = [
+            _page(_sampled_by_page(0, 10, total_pages=50)),
+            _page(_sampled_by_page(250, 10, total_pages=50)),
+            _page(_sampled_by_page(260, 10, total_pages=50)),
+        ]
+
+        result = await scraper.get_sampled_by(list_url, limit=10, offset=255)
+
+        assert [t["track"] for t in result["sampled_by"]] == [
+            f"Track {i}" for i in range(255, 265)
+        ]
+        # The first page, for the page size and count, then pages 26 and 27
+        assert [call.args[0] for call in mock_fetch.call_args_list] == [
+            list_url,
+            f"{list_url}?cp=26",
+            f"{list_url}?cp=27",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_get_track_details_sampled_by_url(scraper):
+    """Test that the link to the full "sampled by" list is recorded."""
+    html = """
+    <html>
+        <body>
+            <h1 class="trackName">Amen, Brother</h1>
+            <section class="subsection">
+                <h3>Was sampled in</h3>
+                <div class="trackItem">
+                    <a class="trackName" href="/N.W.A/Straight-Outta-Compton/">Straight Outta Compton</a>
+                </div>
+                <a href="/The-Winstons/Amen,-Brother/sampled/">See all</a>
+            </section>
+        </body>
+    </html>
+    """
+
+    with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = _page(html)
+
+        result = await scraper.get_track_details(
+            "https://www.whosampled.com/The-Winstons/Amen,-Brother/"
+        )
+
+        assert len(result["sampled_by"]) == 1
+        assert (
+            result["sampled_by_url"]
+            == "https://www.whosampled.com/The-Winstons/Amen,-Brother/sampled/"
+        )
+
+
 @pytest.mark.asyncio
 async def test_extract_connections():
     """Test the _extract_connections method."""
@@ -207,7 +540,10 @@ async def test_extract_connections_with_youtube():
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
         # First track has YouTube, second doesn't
-        mock_fetch.side_effect = [track_page_with_youtube, track_page_without_youtube]
+        mock_fetch.side_effect = [
+            _page(track_page_with_youtube),
+            _page(track_page_without_youtube),
+        ]
 
         connections = await scraper._extract_connections_with_youtube(
             section, include_youtube=True
@@ -257,7 +593,9 @@ async def test_get_youtube_links_from_search(scraper):
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
         # First call returns search results, subsequent calls return track pages
-        mock_fetch.side_effect = [mock_search_html] + [mock_track_page_html] * 10
+        mock_fetch.side_effect = [_page(mock_search_html)] + [
+            _page(mock_track_page_html)
+        ] * 10
 
         result = await scraper.get_youtube_links_from_search(
             "Daft Punk One More Time", max_per_section=2
@@ -288,7 +626,7 @@ async def test_get_youtube_links_from_search_no_results(scraper):
     empty_html = "<html><body></body></html>"
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = empty_html
+        mock_fetch.return_value = _page(empty_html)
 
         result = await scraper.get_youtube_links_from_search(
             "Unknown Track", max_per_section=3
@@ -339,7 +677,7 @@ async def test_extract_single_track_with_youtube(scraper):
     track_link = soup.select_one("a.trackName")
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = track_page_html
+        mock_fetch.return_value = _page(track_page_html)
 
         result = await scraper._extract_single_track_with_youtube(track_link)
 
@@ -376,7 +714,7 @@ async def test_extract_single_track_without_youtube(scraper):
     track_link = soup.select_one("a.trackName")
 
     with patch.object(scraper, "_fetch_page", new_callable=AsyncMock) as mock_fetch:
-        mock_fetch.return_value = track_page_html
+        mock_fetch.return_value = _page(track_page_html)
 
         result = await scraper._extract_single_track_with_youtube(track_link)
 
@@ -0,0 +1,316 @@
+"""Tests for the MCP server's tool helpers."""
+
+import os
+
+import orjson
+import pytest
+from bs4 import BeautifulSoup
+from unittest.mock import AsyncMock, patch
+from whosampled_connector import cache, server
+
+TRACK_URL = "https://www.whosampled.com/Daft-Punk/Harder,-Better,-Faster,-Stronger/"
+
+
+def test_lookup_youtube_id_uses_page_result():
+    """Test that the ID read from the track page is used and cached."""
+    details = {"youtube_id": "gAjR4_CbPpQ"}
+    assert server._lookup_youtube_id(TRACK_URL, details) == "gAjR4_CbPpQ"
+
+    # Later lookups hit the cache, even without the page's answer
+    assert server._lookup_youtube_id(TRACK_URL, {}) == "gAjR4_CbPpQ"
+
+    entry = cache.get_cache().get(cache.make_key("youtube", TRACK_URL))
+    assert entry["ttl"] == server.YOUTUBE_ID_TTL
+
+
+def test_lookup_youtube_id_caches_missing_video():
+    """Test that a page without an embed is cached as an answer."""
+    details = {"youtube_id": None}
+    assert server._lookup_youtube_id(TRACK_URL, details) is None
+
+    # A video found later doesn't replace the cached answer until it expires
+    assert server._lookup_youtube_id(TRACK_URL, {"youtube_id": "gAjR4_CbPpQ"}) is None
+
+    entry = cache.get_cache().get(cache.make_key("youtube", TRACK_URL))
+    assert entry["ttl"] == server.NO_YOUTUBE_ID_TTL
+
+
+def test_search_track_caches_equivalent_queries():
+    """Test that a found track is cached and reused for equivalent queries."""
+    server.search_track.cache_clear()
+    found = {
+        "title": "Harder, Better, Faster, Stronger",
+        "artist": "Daft Punk",
+        "url": TRACK_URL,
+    }
+
+    with patch.object(
+        server.SCRAPER, "search_track", new_callable=AsyncMock
+    ) as mock_search:
+        mock_search.return_value = found
+
+        first = server.search_track("Daft Punk  Harder Better Faster Stronger")
+        second = server.search_track("daft punk harder better faster stronger")
+
+    assert first == second
+    assert first["url"] == TRACK_URL
+    mock_search.assert_called_once()
+
+
+def test_search_track_not_found_is_not_cached():
+    """Test that a query with no match is looked up again."""
+    server.search_track.cache_clear()
+
+    with patch.object(
+        server.SCRAPER, "search_track", new_callable=AsyncMock
+    ) as mock_search:
+        mock_search.return_value = None
+
+        assert "error" in server.search_track("Unknown Track")
+        assert "error" in server.search_track("Unknown Track")
+
+    assert mock_search.call_count == 2
+
+
+def _details(preview_count, sampled_by_url=None):
+    """Build raw track details with a numbered "sampled by" preview."""
+    details = {
+        "samples": [],
+        "sampled_by": [{"track": f"Track {i}"} for i in range(preview_count)],
+        "covers": [],
+        "remixes": [],
+    }
+    if sampled_by_url:
+        details["sampled_by_url"] = sampled_by_url
+    return details
+
+
+def test_window_sampled_by_within_preview():
+    """Test that a window inside the track page's preview needs no extra fetch."""
+    details = _details(10, sampled_by_url=f"{TRACK_URL}sampled/")
+
+    with patch.object(server, "_lookup_sampled_by") as mock_lookup:
+        window = server._window_sampled_by(details, limit=3, offset=2, include_youtube=False)
+
+    assert [t["track"] for t in window] == ["Track 2", "Track 3", "Track 4"]
+    mock_lookup.assert_not_called()
+
+
+def test_window_sampled_by_pages_full_list():
+    """Test that a window past the preview is read from the full list."""
+    list_url = f"{TRACK_URL}sampled/"
+    details = _details(10, sampled_by_url=list_url)
+    full = [{"track": f"Track {i}"} for i in range(8, 13)]
+
+    with patch.object(server, "_lookup_sampled_by") as mock_lookup:
+        mock_lookup.return_value = {"url": list_url, "sampled_by": full}
+        window = server._window_sampled_by(
+            details, limit=5, offset=8, include_youtube=False
+        )
+
+    assert window == full
+    mock_lookup.assert_called_once_with(list_url, 5, 8, False)
+
+
+def test_window_sampled_by_without_full_list():
+    """Test that the preview is used when the track has no full list."""
+    details = _details(3)
+
+    with patch.object(server, "_lookup_sampled_by") as mock_lookup:
+        window = server._window_sampled_by(details, limit=5, offset=1, include_youtube=False)
+
+    assert [t["track"] for t in window] == ["Track 1", "Track 2"]
+    mock_lookup.assert_not_called()
+
+
+def test_window_sampled_by_falls_back_to_preview():
+    """Test that a failed full-list fetch falls back to the preview."""
+    details = _details(10, sampled_by_url=f"{TRACK_URL}sampled/")
+
+    with patch.object(server, "_lookup_sampled_by") as mock_lookup:
+        mock_lookup.return_value = {"error": "Network error"}
+        window = server._window_sampled_by(
+            details, limit=5, offset=8, include_youtube=False
+        )
+
+    assert [t["track"] for t in window] == ["Track 8", "Track 9"]
+
+
+def test_get_track_details_by_url_youtube_for_full_sampled_by():
+    """Test that a "sampled by" window from the full list gets YouTube links."""
+    list_url = f"{TRACK_URL}sampled/"
+    track_page = f"""
+        <html><body><h1 class="trackName">Harder, Better, Faster, Stronger</h1>
+        <section class="subsection"><h3>Was sampled in</h3>
+            <a class="trackName" href="/Preview/Track/">Preview Track</a>
+            <a href="{list_url}">See all</a>
+        </section></body></html>
+    """
+    list_page = """
+        <html><body>
+            <a class="trackName" href="/Kanye-West/Stronger/">Stronger</a>
+            <a class="trackName" href="/Other/Track/">Other Track</a>
+        </body></html>
+    """
+    embed_page = """
+        <html><body><h1>Stronger</h1>
+            <div class="embed-placeholder" data-id="PsO6ZnUZI0g"></div>
+        </body></html>
+    """
+    pages = {
+        TRACK_URL: track_page,
+        list_url: list_page,
+        "https://www.whosampled.com/Kanye-West/Stronger/": embed_page,
+        "https://www.whosampled.com/Other/Track/": "<html><body><h1>Other</h1></body></html>",
+    }
+    fetched = []
+
+    async def fetch_page(url, wait_for=None):
+        fetched.append(url)
+        return BeautifulSoup(pages[url], "lxml")
+
+    with patch.object(server.SCRAPER, "_fetch_page", side_effect=fetch_page):
+        result = server.get_track_details_by_url(TRACK_URL, include_youtube=True)
+
+    assert result["sampled_by"] == [
+        {
+            "track": "Stronger",
+            "artist": "Kanye West",
+            "url": "https://www.whosampled.com/Kanye-West/Stronger/",
+            "youtube_url": "https://youtu.be/PsO6ZnUZI0g",
+        },
+        {
+            "track": "Other Track",
+            "artist": "Other",
+            "url": "https://www.whosampled.com/Other/Track/",
+        },
+    ]
+    # The preview is replaced by the full list, so its YouTube links aren't fetched
+    assert "https://www.whosampled.com/Preview/Track/" not in fetched
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"sampled_by_limit": -1},
+        {"sampled_by_offset": -5},
+        {"sampled_by_limit": "20"},
+        {"sampled_by_offset": 1.5},
+        {"sampled_by_limit": True},
+    ],
+)
+def test_get_track_details_by_url_rejects_bad_window(args):
+    """Test that invalid sampled_by window arguments are reported, not used."""
+    with patch.object(server, "_lookup_details") as mock_lookup:
+        result = server.get_track_details_by_url(TRACK_URL, **args)
+
+    assert "error" in result
+    assert next(iter(args)) in result["error"]
+    mock_lookup.assert_not_called()
+
+
+class _FakeStdout:
+    """Stands in for sys.stdout, recording what had been flushed at each flush."""
+
+    def __init__(self):
+        self.buffer = self
+        self.written = b""
+        self.flushed = []
+
+    def write(self, data):
+        self.written += data
+
+    def flush(self):
+        self.flushed.append(self.written)
+
+
+def _run_cli(monkeypatch, stdout, *requests):
+    """Run cli() over requests piped to stdin, writing to the fake stdout."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"".join(orjson.dumps(r) + b"\n" for r in requests))
+    os.close(write_fd)
+
+    monkeypatch.setenv("WHOSAMPLED_PREWARM", "0")
+    monkeypatch.setattr("sys.stdout", stdout)
+    with os.fdopen(read_fd) as stdin:
+        monkeypatch.setattr("sys.stdin", stdin)
+        server.cli()
+
+
+def _details_request(stream):
+    """Build a get_track_details_by_url request line."""
+    return {
+        "tool": "get_track_details_by_url",
+        "args": {"url": TRACK_URL, "track_title": "Amen, Brother", "stream": stream},
+    }
+
+
+def test_cli_streams_partial_sections(monkeypatch):
+    """Test that partial sections are flushed before the final result line."""
+    stdout = _FakeStdout()
+    flushed_before_window = []
+
+    def window(details, limit, offset, include_youtube):
+        flushed_before_window.append(stdout.flushed[-1] if stdout.flushed else b"")
+        return details["sampled_by"]
+
+    with (
+        patch.object(server, "_lookup_details", return_value=_details(2)),
+        patch.object(server, "_window_sampled_by", side_effect=window),
+    ):
+        _run_cli(monkeypatch, stdout, _details_request(stream=True))
+
+    lines = stdout.written.splitlines(keepends=True)
+    assert [orjson.loads(line) for line in lines[:2]] == [
+        {"partial": {"samples": [], "covers": [], "remixes": []}},
+        {"partial": {"sampled_by": _details(2)["sampled_by"]}},
+    ]
+    assert orjson.loads(lines[2])["result"]["sampled_by"] == _details(2)["sampled_by"]
+    assert len(lines) == 3
+
+    # The first section was on the wire while the next was still being looked up
+    assert flushed_before_window == [lines[0]]
+
+
+def test_cli_stream_error_is_single_result(monkeypatch):
+    """Test that a lookup failing before any section yields one result line."""
+    with patch.object(
+        server, "_lookup_details", return_value={"error": "Network error"}
+    ):
+        stdout = _FakeStdout()
+        _run_cli(monkeypatch, stdout, _details_request(stream=True))
+
+    assert stdout.written.splitlines() == [
+        orjson.dumps({"result": {"error": "Network error"}})
+    ]
+
+
+def test_cli_without_stream_writes_one_result(monkeypatch):
+    """Test that non-streaming output is a single result line, as before."""
+    with patch.object(server, "_lookup_details", return_value=_details(2)):
+        stdout = _FakeStdout()
+        _run_cli(monkeypatch, stdout, _details_request(stream=False))
+
+    assert [orjson.loads(line) for line in stdout.written.splitlines()] == [
+        {
+            "result": {
+                "track": "Amen, Brother",
+                "url": TRACK_URL,
+                "samples": [],
+                "sampled_by": _details(2)["sampled_by"],
+                "covers": [],
+                "remixes": [],
+            }
+        }
+    ]
+
+
+def test_cli_pipelined_requests_flush_once(monkeypatch):
+    """Test that a burst of requests that arrived together is flushed once."""
+    stdout = _FakeStdout()
+    _run_cli(monkeypatch, stdout, *({"tool": "unknown"} for _ in range(5)))
+
+    assert stdout.written.splitlines() == [
+        orjson.dumps({"error": "Unknown tool: unknown"})
+    ] * 5
+    assert stdout.flushed == [stdout.written]
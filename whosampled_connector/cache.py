@@ -0,0 +1,206 @@
+"""
+Persistent disk cache for WhoSampled lookups.
+
+Scraping a WhoSampled page takes a full headless-browser roundtrip, so results
+are stored on disk and reused across server restarts.
+"""
+
+import functools
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Union
+
+import diskcache
+
+from . import __version__
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "whosampled-mcp"
+)
+DEFAULT_CACHE_TTL = 86400
+
+_cache: Optional[diskcache.Cache] = None
+
+
+def get_cache() -> diskcache.Cache:
+    """
+    Get the shared cache instance, opening it on first use.
+
+    The location can be overridden with the WHOSAMPLED_CACHE_DIR environment
+    variable.
+    """
+    global _cache
+    if _cache is None:
+        cache_dir = os.environ.get("WHOSAMPLED_CACHE_DIR", DEFAULT_CACHE_DIR)
+        _cache = diskcache.Cache(cache_dir)
+    return _cache
+
+
+def default_ttl() -> int:
+    """Get the cache TTL in seconds from WHOSAMPLED_CACHE_TTL, if set."""
+    try:
+        return int(os.environ.get("WHOSAMPLED_CACHE_TTL", DEFAULT_CACHE_TTL))
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so trivially different spellings share a key.
+
+    Args:
+        query: Raw search query
+
+    Returns:
+        NFKC-normalized, casefolded query with surrounding and repeated
+        whitespace removed
+    """
+    return unicodedata.normalize("NFKC", " ".join(query.split())).casefold()
+
+
+def _is_cacheable(result: Any) -> bool:
+    """Check that a result is neither missing nor an error response."""
+    return result is not None and not (
+        isinstance(result, dict) and result.get("error")
+    )
+
+
+def make_key(namespace: str, normalized_args: str) -> str:
+    """Build a cache key from a namespace and normalized arguments."""
+    return hashlib.blake2b(f"{namespace}|{normalized_args}".encode()).hexdigest()
+
+
+def get_or_compute(
+    namespace: str,
+    normalized_args: str,
+    compute: Callable[[], Any],
+    ttl: Union[int, Callable[[Any], int], None] = None,
+) -> Any:
+    """
+    Get a cached value, computing and storing it on a miss.
+
+    None and dicts containing an "error" key are never stored.
+
+    Args:
+        namespace: Prefix separating this kind of entry from others
+        normalized_args: Normalized argument string used for the key
+        compute: Called to produce the value on a cache miss
+        ttl: Expiry in seconds (defaults to WHOSAMPLED_CACHE_TTL or one day),
+            or a function returning it for the computed value
+
+    Returns:
+        The cached or freshly computed value
+    """
+    key = make_key(namespace, normalized_args)
+    cache = get_cache()
+
+    entry = cache.get(key)
+    if entry is not None and entry.get("version") == __version__:
+        return entry["result"]
+
+    result = compute()
+
+    if _is_cacheable(result):
+        if callable(ttl):
+            expire = ttl(result)
+        else:
+            expire = ttl if ttl is not None else default_ttl()
+        cache.set(
+            key,
+            {
+                "version": __version__,
+                "timestamp": time.time(),
+                "ttl": expire,
+                "result": result,
+            },
+            expire=expire,
+        )
+
+    return result
+
+
+def disk_cached(
+    namespace: str,
+    key_func: Callable[..., str],
+    ttl: Optional[int] = None,
+):
+    """
+    Cache the result of a function on disk.
+
+    Results containing an "error" key are never stored.
+
+    Args:
+        namespace: Prefix separating this function's entries from others
+        key_func: Called with the function's arguments, returns the
+            normalized argument string used for the key
+        ttl: Expiry in seconds (defaults to WHOSAMPLED_CACHE_TTL or one day)
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                namespace,
+                key_func(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def memory_cached(
+    key_func: Callable[..., str],
+    maxsize: int = 1024,
+    ttl: Optional[int] = None,
+):
+    """
+    Cache the result of a function in an in-process LRU.
+
+    Used in front of the disk cache so repeated queries skip even the disk
+    lookup. Results containing an "error" key are never stored.
+
+    Args:
+        key_func: Called with the function's arguments, returns the key
+        maxsize: Maximum number of entries kept
+        ttl: Expiry in seconds (defaults to WHOSAMPLED_CACHE_TTL or one day)
+    """
+
+    def decorator(func):
+        entries: "OrderedDict[str, tuple]" = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            now = time.monotonic()
+
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(key)
+                    return entry[1]
+
+            result = func(*args, **kwargs)
+
+            if _is_cacheable(result):
+                expire = ttl if ttl is not None else default_ttl()
+                with lock:
+                    entries[key] = (now + expire, result)
+                    entries.move_to_end(key)
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+
+            return result
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+
+    return decorator
@@ -1,12 +1,47 @@
 """
 WhoSampled scraper module using Playwright for anti-bot bypass.
+
+Pages are fetched over plain HTTP first, falling back to Playwright when the
+request is blocked or the content is rendered client-side.
 """
 
 from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
+import soupsieve
+import aiohttp
 from typing import List, Dict, Optional
 import urllib.parse
+import asyncio
+import math
 import os
+import re
+import sys
+import time
+
+try:
+    # aiohttp decodes brotli responses only when a brotli package is installed
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+
+# Selectors and patterns are compiled once at import rather than on every call
+_SEL_TRACK_TITLE_LINK = soupsieve.compile("a.trackTitle")
+_SEL_TRACK_NAME_LINK = soupsieve.compile("a.trackName")
+_SEL_TRACK_LINK = soupsieve.compile("a.trackTitle, a.trackName")
+_SEL_TOP_RESULT = soupsieve.compile("div.topResult, div.top-result, section.topResult")
+_SEL_TRACK_HEADING = soupsieve.compile("h1.trackName, h1")
+_SEL_SUBSECTION = soupsieve.compile("section.subsection")
+_SEL_YOUTUBE_EMBED = soupsieve.compile(
+    "div.embed-placeholder[data-id], div.youtube-placeholder[data-id]"
+)
+_SEL_SAMPLED_BY_ALL = soupsieve.compile("a[href$='/sampled/']")
+_SEL_PAGINATION_LINK = soupsieve.compile("div.pagination a[href*='cp=']")
+_RE_PAGE_NUMBER = re.compile(r"[?&]cp=(\d+)")
+_RE_YEAR_SUFFIX = re.compile(r"\s*\(\d{4}\)$")
 
 
 class WhoSampledScraper:
@@ -14,100 +49,187 @@ class WhoSampledScraper:
 
     BASE_URL = "https://www.whosampled.com"
     SEARCH_URL = f"{BASE_URL}/search/"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+
+    # Elements to wait for before reading a page's HTML
+    SEARCH_READY_SELECTOR = "a.trackTitle, a.trackName"
+    TRACK_READY_SELECTOR = "h1.trackName, h1"
+    READY_TIMEOUT = 5000
+    MAX_CONCURRENT_FETCHES = 4
+
+    # Responses that mean plain HTTP requests are being challenged by anti-bot
+    # protection, so the browser must be used instead
+    STATIC_BLOCKED_STATUSES = {403, 429, 503}
+    # Seconds to skip plain HTTP after a block before trying it again
+    STATIC_BLOCK_COOLDOWN = 600
+
+    # Requests the scraper never reads from, aborted to save bandwidth
+    BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+    BLOCKED_HOSTS = (
+        "doubleclick",
+        "google-analytics",
+        "googletagmanager",
+        "facebook",
+        "youtube",
+    )
 
     def __init__(self):
         self.playwright = None
         self.browser = None
+        self.context = None
+        self._http = None
+        self._static_blocked_until = 0.0
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        # Bound concurrent page fetches to avoid tripping rate limits
+        self._fetch_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
 
     async def _ensure_browser(self):
-        """Ensure browser is initialized."""
-        if not self._initialized:
+        """
+        Ensure browser and shared context are initialized.
+
+        The browser and context live for the lifetime of the scraper, so only
+        a new page is opened per request.
+        """
+        async with self._init_lock:
+            if self._initialized:
+                return
+
             self.playwright = await async_playwright().start()
 
-            # Get proxy from environment variables if available
-            proxy_config = None
-            https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
-            if https_proxy:
-                proxy_config = {"server": https_proxy}
-
-            self.browser = await self.playwright.chromium.launch(
-                headless=True,
-                proxy=proxy_config,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-features=IsolateOrigins,site-per-process",
-                    "--disable-site-isolation-trials",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-web-security",
-                    "--disable-features=VizDisplayCompositor",
-                ],
-            )
-            self._initialized = True
+            try:
+                # Get proxy from environment variables if available
+                proxy_config = None
+                https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
+                if https_proxy:
+                    proxy_config = {"server": https_proxy}
+
+                self.browser = await self.playwright.chromium.launch(
+                    headless=True,
+                    proxy=proxy_config,
+                    args=[
+                        "--disable-blink-features=AutomationControlled",
+                        "--disable-features=IsolateOrigins,site-per-process",
+                        "--disable-site-isolation-trials",
+                        "--no-sandbox",
+                        "--disable-setuid-sandbox",
+                        "--disable-dev-shm-usage",
+                        "--disable-web-security",
+                        "--disable-features=VizDisplayCompositor",
+                    ],
+                )
+
+                self.context = await self.browser.new_context(
+                    user_agent=self.USER_AGENT,
+                    viewport={"width": 1920, "height": 1080},
+                    locale="en-US",
+                    timezone_id="America/New_York",
+                    permissions=["geolocation"],
+                    geolocation={"latitude": 40.7128, "longitude": -74.0060},
+                    extra_http_headers={
+                        "Accept-Language": "en-US,en;q=0.9",
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                        "Sec-Fetch-Dest": "document",
+                        "Sec-Fetch-Mode": "navigate",
+                        "Sec-Fetch-Site": "none",
+                        "Upgrade-Insecure-Requests": "1",
+                    },
+                )
 
-    async def _fetch_page(self, url: str) -> str:
+                # Inject stealth scripts before navigation on every page
+                await self.context.add_init_script("""
+                    // Override navigator.webdriver
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => false
+                    });
+
+                    // Override chrome property
+                    window.chrome = {
+                        runtime: {}
+                    };
+
+                    // Override permissions
+                    const originalQuery = window.navigator.permissions.query;
+                    window.navigator.permissions.query = (parameters) => (
+                        parameters.name === 'notifications' ?
+                            Promise.resolve({ state: Notification.permission }) :
+                            originalQuery(parameters)
+                    );
+                """)
+
+                await self.context.route("**/*", self._route_request)
+
+                self._initialized = True
+            except Exception:
+                # Don't leave the playwright driver (or a launched browser)
+                # running when a later step fails; the next call starts over
+                if self.browser:
+                    await self.browser.close()
+                await self.playwright.stop()
+                self.browser = None
+                self.context = None
+                self.playwright = None
+                raise
+
+    async def _route_request(self, route):
         """
-        Fetch a page using headless browser.
+        Abort requests for resources the scraper never reads.
+
+        YouTube is always blocked: video IDs are read from the embed
+        placeholder's data-id attribute, not from the player itself.
 
         Args:
-            url: URL to fetch
+            route: Playwright route for the intercepted request
+        """
+        request = route.request
+        host = urllib.parse.urlparse(request.url).hostname or ""
+
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES or any(
+            blocked in host for blocked in self.BLOCKED_HOSTS
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_page(self) -> Page:
+        """
+        Open a new page in the shared browser context.
 
         Returns:
-            Page HTML content
+            New page; the caller is responsible for closing it
         """
         await self._ensure_browser()
+        return await self.context.new_page()
 
-        context = await self.browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale="en-US",
-            timezone_id="America/New_York",
-            permissions=["geolocation"],
-            geolocation={"latitude": 40.7128, "longitude": -74.0060},
-            extra_http_headers={
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "none",
-                "Upgrade-Insecure-Requests": "1",
-            },
-        )
+    async def _load_page(
+        self, page: Page, url: str, wait_for: Optional[str] = None
+    ) -> str:
+        """
+        Navigate an open page to a URL and return its HTML.
 
-        page = await context.new_page()
-
-        # Inject stealth scripts before navigation
-        await page.add_init_script("""
-            // Override navigator.webdriver
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => false
-            });
-
-            // Override chrome property
-            window.chrome = {
-                runtime: {}
-            };
-
-            // Override permissions
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-            );
-        """)
+        Args:
+            page: Page to navigate
+            url: URL to fetch
+            wait_for: CSS selector to wait for before reading the HTML
 
+        Returns:
+            Page HTML content
+        """
         try:
-            # Navigate to page with more lenient wait condition
             await page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
-            # Wait for page to be ready
-            await page.wait_for_load_state("domcontentloaded")
-
-            # Wait a bit longer for dynamic content
-            await page.wait_for_timeout(2000)
+            # Proceed as soon as the data we read is present, rather than
+            # waiting a fixed time for the rest of the page to settle. Only
+            # the HTML is read, so the element need not be visible (with
+            # stylesheets and images blocked, many never are)
+            if wait_for:
+                try:
+                    await page.wait_for_selector(
+                        wait_for, state="attached", timeout=self.READY_TIMEOUT
+                    )
+                except PlaywrightTimeoutError:
+                    # Not every page has the element (e.g. empty search results)
+                    pass
 
             # Get page content
             content = await page.content()
@@ -115,12 +237,103 @@ class WhoSampledScraper:
             return content
 
         except Exception as e:
-            print(f"Error fetching page {url}: {e}")
+            print(f"Error fetching page {url}: {e}", file=sys.stderr)
             raise
 
-        finally:
-            await page.close()
-            await context.close()
+    async def _ensure_http(self) -> aiohttp.ClientSession:
+        """Ensure the HTTP session for static page fetches is initialized."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=20,
+                    limit_per_host=8,
+                    ttl_dns_cache=600,
+                    keepalive_timeout=60,
+                    enable_cleanup_closed=True,
+                ),
+                timeout=aiohttp.ClientTimeout(total=15),
+                headers={
+                    "User-Agent": self.USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.9",
+                    "Accept-Encoding": _ACCEPT_ENCODING,
+                },
+                # Picks up HTTPS_PROXY like the browser does
+                trust_env=True,
+            )
+        return self._http
+
+    async def _fetch_static(self, url: str) -> Optional[str]:
+        """
+        Fetch a page over plain HTTP, without a browser.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            Page HTML content, or None if the browser is needed
+        """
+        if time.monotonic() < self._static_blocked_until:
+            return None
+
+        try:
+            http = await self._ensure_http()
+            async with http.get(url) as response:
+                if response.status in self.STATIC_BLOCKED_STATUSES:
+                    # Don't pay for a failed request on every fetch while
+                    # the block lasts
+                    self._static_blocked_until = (
+                        time.monotonic() + self.STATIC_BLOCK_COOLDOWN
+                    )
+                    return None
+                if response.status != 200:
+                    return None
+                html = await response.text()
+
+        except Exception as e:
+            # Includes decoding errors (e.g. a wrong or unknown charset), not
+            # only connection failures; the browser is tried either way
+            # stdout is the MCP channel when run as a server
+            print(f"Error fetching page {url} without browser: {e}", file=sys.stderr)
+            return None
+
+        return html
+
+    async def _fetch_page(
+        self, url: str, wait_for: Optional[str] = None
+    ) -> BeautifulSoup:
+        """
+        Fetch and parse a page, using the headless browser only if plain HTTP
+        fails.
+
+        Each page is parsed once, and the same tree is used both to check that
+        the plain HTTP response has the expected content and by the caller.
+
+        Args:
+            url: URL to fetch
+            wait_for: CSS selector to wait for before reading the HTML
+
+        Returns:
+            Parsed page
+        """
+        async with self._fetch_semaphore:
+            html = await self._fetch_static(url)
+            if html is not None:
+                soup = BeautifulSoup(html, "lxml")
+                # The data may be rendered client-side, in which case use the
+                # browser
+                if not wait_for or soup.select_one(wait_for) is not None:
+                    return soup
+
+            page = await self._new_page()
+
+            try:
+                html = await self._load_page(page, url, wait_for=wait_for)
+
+            finally:
+                await page.close()
+
+        return BeautifulSoup(html, "lxml")
 
     async def search_track(self, query: str) -> Optional[Dict]:
         """
@@ -136,29 +349,84 @@ class WhoSampledScraper:
         search_url = f"{self.SEARCH_URL}?{params}"
 
         try:
-            html = await self._fetch_page(search_url)
-            soup = BeautifulSoup(html, "lxml")
-
-            # Find the first track result
-            # Try both trackTitle and trackName classes
-            track_result = soup.select_one("a.trackTitle") or soup.select_one(
-                "a.trackName"
+            soup = await self._fetch_page(
+                search_url, wait_for=self.SEARCH_READY_SELECTOR
             )
-            if not track_result:
-                return None
+            return self._parse_search_result(soup)
 
-            track_url = self.BASE_URL + track_result.get("href", "")
-            track_title = track_result.get_text(strip=True)
+        except Exception as e:
+            print(f"Error searching track: {e}", file=sys.stderr)
+            return None
 
-            # Extract artist name from the result
-            artist_name = self._extract_artist_name(track_result)
+    def _parse_search_result(self, soup) -> Optional[Dict]:
+        """
+        Parse the first track result from a search results page.
 
-            return {"title": track_title, "artist": artist_name, "url": track_url}
+        Args:
+            soup: BeautifulSoup search results page
 
-        except Exception as e:
-            print(f"Error searching track: {e}")
+        Returns:
+            Dictionary with track information and URL, or None if not found
+        """
+        # Find the first track result
+        # Try both trackTitle and trackName classes
+        track_result = _SEL_TRACK_TITLE_LINK.select_one(soup) or (
+            _SEL_TRACK_NAME_LINK.select_one(soup)
+        )
+        if not track_result:
             return None
 
+        track_url = self.BASE_URL + track_result.get("href", "")
+        track_title = track_result.get_text(strip=True)
+
+        # Extract artist name from the result
+        artist_name = self._extract_artist_name(track_result)
+
+        return {"title": track_title, "artist": artist_name, "url": track_url}
+
+    async def search_and_fetch_details(
+        self, query: str, include_youtube: bool = False
+    ) -> Dict:
+        """
+        Search for a track and get its details in a single scraper call.
+
+        Both pages go through _fetch_page, so they use plain HTTP when
+        possible and count against the concurrent fetch limit.
+
+        Args:
+            query: Search query (artist name, track name, or both)
+            include_youtube: Whether to include YouTube links
+
+        Returns:
+            Dictionary with track details including samples, covers, remixes,
+            plus the matched track's artist
+        """
+        params = urllib.parse.urlencode({"q": query})
+        search_url = f"{self.SEARCH_URL}?{params}"
+
+        try:
+            soup = await self._fetch_page(
+                search_url, wait_for=self.SEARCH_READY_SELECTOR
+            )
+            track = self._parse_search_result(soup)
+            if not track:
+                return {"error": "No track found for the query.", "query": query}
+
+            soup = await self._fetch_page(
+                track["url"], wait_for=self.TRACK_READY_SELECTOR
+            )
+            result = await self._parse_track_details(
+                soup, track["url"], include_youtube
+            )
+            result["title"] = track["title"]
+            result["artist"] = track["artist"]
+
+            return result
+
+        except Exception as e:
+            print(f"Error searching and getting track details: {e}", file=sys.stderr)
+            return {"error": str(e), "query": query}
+
     async def get_youtube_links_from_search(
         self, query: str, max_per_section: int = 3
     ) -> Dict:
@@ -178,16 +446,15 @@ class WhoSampledScraper:
         result = {"query": query, "top_hit": [], "connections": [], "tracks": []}
 
         try:
-            html = await self._fetch_page(search_url)
-            soup = BeautifulSoup(html, "lxml")
+            soup = await self._fetch_page(
+                search_url, wait_for=self.SEARCH_READY_SELECTOR
+            )
 
             # Find sections in the search results
             # WhoSampled typically has: top result, connections, and tracks sections
 
             # Try to identify Top Hit (usually the first prominent result)
-            top_hit_section = soup.select_one(
-                "div.topResult, div.top-result, section.topResult"
-            )
+            top_hit_section = _SEL_TOP_RESULT.select_one(soup)
             if top_hit_section:
                 tracks = await self._extract_tracks_with_youtube(
                     top_hit_section, max_per_section
@@ -195,7 +462,7 @@ class WhoSampledScraper:
                 result["top_hit"] = tracks
             elif not top_hit_section:
                 # If no specific top hit section, treat first track as top hit
-                first_track = soup.select_one("a.trackTitle, a.trackName")
+                first_track = _SEL_TRACK_LINK.select_one(soup)
                 if first_track:
                     tracks = await self._extract_tracks_with_youtube(
                         soup, 1, start_from_first=True
@@ -225,7 +492,7 @@ class WhoSampledScraper:
 
             # Find Tracks section (general results)
             # Usually all track results not in top hit or connections
-            all_track_links = soup.select("a.trackTitle, a.trackName")
+            all_track_links = _SEL_TRACK_LINK.select(soup)
 
             # Filter out tracks already in top_hit or connections
             existing_urls = set()
@@ -251,7 +518,7 @@ class WhoSampledScraper:
             return result
 
         except Exception as e:
-            print(f"Error getting YouTube links from search: {e}")
+            print(f"Error getting YouTube links from search: {e}", file=sys.stderr)
             return {"error": str(e), "query": query}
 
     async def _extract_tracks_with_youtube(
@@ -269,7 +536,7 @@ class WhoSampledScraper:
             List of dictionaries with track information and YouTube links
         """
         tracks = []
-        track_links = section.select("a.trackTitle, a.trackName")
+        track_links = _SEL_TRACK_LINK.select(section)
 
         for i, track_link in enumerate(track_links):
             if i >= max_count:
@@ -306,29 +573,19 @@ class WhoSampledScraper:
 
             # Get YouTube link from track page
             if track_url:
-                try:
-                    html = await self._fetch_page(track_url)
-                    soup = BeautifulSoup(html, "lxml")
-
-                    # WhoSampled uses data-id attribute for YouTube video IDs
-                    youtube_embed = soup.select_one(
-                        "div.embed-placeholder[data-id], div.youtube-placeholder[data-id]"
-                    )
-                    if youtube_embed:
-                        video_id = youtube_embed.get("data-id", "")
-                        if video_id:
-                            track_info["youtube_url"] = f"https://youtu.be/{video_id}"
-                except Exception as e:
-                    print(f"Error fetching YouTube link for {track_url}: {e}")
+                track_info["youtube_url"] = await self._fetch_youtube_url(track_url)
 
             return track_info
 
         except Exception as e:
-            print(f"Error extracting track with YouTube: {e}")
+            print(f"Error extracting track with YouTube: {e}", file=sys.stderr)
             return None
 
     async def get_track_details(
-        self, track_url: str, include_youtube: bool = False
+        self,
+        track_url: str,
+        include_youtube: bool = False,
+        full_sampled_by: bool = False,
     ) -> Dict:
         """
         Get detailed information about a track.
@@ -336,84 +593,198 @@ class WhoSampledScraper:
         Args:
             track_url: URL of the track page
             include_youtube: Whether to include YouTube links
+            full_sampled_by: Whether the caller reads "sampled by" from the
+                full list when there is one (see get_sampled_by), so the
+                track page's preview of it needs no YouTube links
 
         Returns:
             Dictionary with track details including samples, covers, remixes
         """
         try:
-            html = await self._fetch_page(track_url)
-            soup = BeautifulSoup(html, "lxml")
+            soup = await self._fetch_page(
+                track_url, wait_for=self.TRACK_READY_SELECTOR
+            )
+            return await self._parse_track_details(
+                soup, track_url, include_youtube, full_sampled_by
+            )
 
-            result = {
-                "url": track_url,
-                "samples": [],
-                "sampled_by": [],
-                "covers": [],
-                "covered_by": [],
-                "remixes": [],
-                "remixed_by": [],
-            }
+        except Exception as e:
+            print(f"Error getting track details: {e}", file=sys.stderr)
+            return {"error": str(e), "url": track_url}
 
-            # Get track title and artist
-            title_elem = soup.select_one("h1.trackName, h1")
-            if title_elem:
-                result["title"] = title_elem.get_text(strip=True)
+    async def _parse_track_details(
+        self,
+        soup,
+        track_url: str,
+        include_youtube: bool = False,
+        full_sampled_by: bool = False,
+    ) -> Dict:
+        """
+        Parse connections from a track page.
 
-            # Get YouTube link if requested
-            if include_youtube:
-                # WhoSampled uses data-id attribute for YouTube video IDs
-                youtube_embed = soup.select_one(
-                    "div.embed-placeholder[data-id], div.youtube-placeholder[data-id]"
+        Args:
+            soup: BeautifulSoup track page
+            track_url: URL of the track page
+            include_youtube: Whether to include YouTube links
+            full_sampled_by: Whether to skip YouTube links for a "sampled by"
+                preview that links to the full list
+
+        Returns:
+            Dictionary with track details including samples, covers, remixes
+        """
+        result = {
+            "url": track_url,
+            "samples": [],
+            "sampled_by": [],
+            "covers": [],
+            "covered_by": [],
+            "remixes": [],
+            "remixed_by": [],
+        }
+
+        # Get track title and artist
+        title_elem = _SEL_TRACK_HEADING.select_one(soup)
+        if title_elem:
+            result["title"] = title_elem.get_text(strip=True)
+
+        # The video ID is always read since it comes with the page, and is
+        # None when there is no embed; the link is only included if requested
+        video_id = self._parse_youtube_id(soup)
+        result["youtube_id"] = video_id
+        if video_id and include_youtube:
+            result["youtube_url"] = f"https://youtu.be/{video_id}"
+
+        # Find all subsections (WhoSampled uses section.subsection with headers)
+        subsections = _SEL_SUBSECTION.select(soup)
+
+        # Classify subsections first, then extract them concurrently
+        pending = []
+
+        for subsection in subsections:
+            # Get the header to determine the type of connection
+            header = subsection.find(["h2", "h3", "h4"])
+            if not header:
+                continue
+
+            header_text = header.get_text(strip=True).lower()
+
+            # Determine connection type based on header text
+            if "contains sample" in header_text or (
+                "sampled" in header_text and "sampled in" not in header_text
+            ):
+                pending.append(("samples", subsection))
+            elif "sampled in" in header_text:
+                pending.append(("sampled_by", subsection))
+            elif "cover of" in header_text:
+                pending.append(("covers", subsection))
+            elif "covered in" in header_text or "covered by" in header_text:
+                pending.append(("covered_by", subsection))
+            elif "remix of" in header_text:
+                pending.append(("remixes", subsection))
+            elif "remixed in" in header_text or "remixed by" in header_text:
+                pending.append(("remixed_by", subsection))
+
+        extracted = await asyncio.gather(
+            *(
+                self._extract_connections_with_youtube(
+                    subsection,
+                    include_youtube
+                    and not (
+                        full_sampled_by
+                        and key == "sampled_by"
+                        and _SEL_SAMPLED_BY_ALL.select_one(subsection)
+                    ),
                 )
-                if youtube_embed:
-                    video_id = youtube_embed.get("data-id", "")
-                    if video_id:
-                        result["youtube_url"] = f"https://youtu.be/{video_id}"
+                for key, subsection in pending
+            )
+        )
+        for (key, subsection), connections in zip(pending, extracted):
+            result[key] = connections
+
+            # Long lists only show a preview, with a link to the full list
+            if key == "sampled_by":
+                see_all = _SEL_SAMPLED_BY_ALL.select_one(subsection)
+                if see_all:
+                    result["sampled_by_url"] = urllib.parse.urljoin(
+                        self.BASE_URL, see_all.get("href", "")
+                    )
 
-            # Find all subsections (WhoSampled uses section.subsection with headers)
-            subsections = soup.select("section.subsection")
+        return result
 
-            for subsection in subsections:
-                # Get the header to determine the type of connection
-                header = subsection.find(["h2", "h3", "h4"])
-                if not header:
-                    continue
+    async def get_sampled_by(
+        self,
+        list_url: str,
+        limit: int = 20,
+        offset: int = 0,
+        include_youtube: bool = False,
+    ) -> Dict:
+        """
+        Get a window of the full "sampled by" list of a track.
 
-                header_text = header.get_text(strip=True).lower()
+        Heavily sampled tracks span many pages, so besides the first page,
+        which gives the page size and count, only the pages covering the
+        requested window are fetched.
 
-                # Determine connection type based on header text
-                if "contains sample" in header_text or (
-                    "sampled" in header_text and "sampled in" not in header_text
-                ):
-                    result["samples"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
-                    )
-                elif "sampled in" in header_text:
-                    result["sampled_by"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
-                    )
-                elif "cover of" in header_text:
-                    result["covers"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
-                    )
-                elif "covered in" in header_text or "covered by" in header_text:
-                    result["covered_by"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
-                    )
-                elif "remix of" in header_text:
-                    result["remixes"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
-                    )
-                elif "remixed in" in header_text or "remixed by" in header_text:
-                    result["remixed_by"] = await self._extract_connections_with_youtube(
-                        subsection, include_youtube
+        Args:
+            list_url: URL of the track's full "sampled by" list
+            limit: Maximum number of tracks to return
+            offset: Number of tracks to skip
+            include_youtube: Whether to include YouTube links for the
+                returned tracks
+
+        Returns:
+            Dictionary with the requested tracks and the total number of pages
+        """
+        try:
+            soup = await self._fetch_page(list_url, wait_for=self.TRACK_READY_SELECTOR)
+
+            tracks = self._extract_connections(soup)
+            per_page = len(tracks)
+
+            page_numbers = [
+                int(match.group(1))
+                for link in _SEL_PAGINATION_LINK.select(soup)
+                if (match := _RE_PAGE_NUMBER.search(link.get("href", "")))
+            ]
+            total_pages = max(page_numbers, default=1)
+
+            # Position of the first collected track in the full list
+            start = 0
+            if per_page:
+                first_page = offset // per_page + 1
+                last_page = min(total_pages, math.ceil((offset + limit) / per_page))
+                if first_page > 1:
+                    # The first page was only needed for the page size and
+                    # count, the window starts on a later one
+                    tracks = []
+                    start = (first_page - 1) * per_page
+
+                separator = "&" if "?" in list_url else "?"
+                pages = await asyncio.gather(
+                    *(
+                        self._fetch_page(
+                            f"{list_url}{separator}cp={page}",
+                            wait_for=self.TRACK_READY_SELECTOR,
+                        )
+                        for page in range(max(2, first_page), last_page + 1)
                     )
+                )
+                for page_soup in pages:
+                    tracks.extend(self._extract_connections(page_soup))
 
-            return result
+            window = tracks[offset - start : offset - start + limit]
+            if include_youtube:
+                await self._add_youtube_urls(window)
+
+            return {
+                "url": list_url,
+                "sampled_by": window,
+                "total_pages": total_pages,
+            }
 
         except Exception as e:
-            print(f"Error getting track details: {e}")
-            return {"error": str(e), "url": track_url}
+            print(f"Error getting sampled by list: {e}", file=sys.stderr)
+            return {"error": str(e), "url": list_url}
 
     def _extract_artist_name(self, track_link) -> str:
         """
@@ -444,8 +815,7 @@ class WhoSampledScraper:
             if text.startswith("by "):
                 text = text[3:].strip()
             # Remove year suffix like " (2024)"
-            import re
-            text = re.sub(r'\s*\(\d{4}\)$', '', text)
+            text = _RE_YEAR_SUFFIX.sub("", text)
             if text:
                 return text
 
@@ -521,7 +891,7 @@ class WhoSampledScraper:
                     return artist_name
 
         except Exception as e:
-            print(f"Error extracting artist from URL {url}: {e}")
+            print(f"Error extracting artist from URL {url}: {e}", file=sys.stderr)
 
         return "Unknown"
 
@@ -538,7 +908,7 @@ class WhoSampledScraper:
         connections = []
 
         # Find all track links (a.trackName elements)
-        track_links = section.select("a.trackName")
+        track_links = _SEL_TRACK_NAME_LINK.select(section)
 
         for track_link in track_links:
             track_name = track_link.get_text(strip=True)
@@ -564,56 +934,82 @@ class WhoSampledScraper:
         Returns:
             List of dictionaries with track information and YouTube links
         """
-        connections = []
+        connections = self._extract_connections(section)
 
-        # Find all track links (a.trackName elements)
-        track_links = section.select("a.trackName")
+        if include_youtube:
+            await self._add_youtube_urls(connections)
 
-        for track_link in track_links:
-            track_name = track_link.get_text(strip=True)
-            track_href = track_link.get("href", "")
-            track_url = self.BASE_URL + track_href if track_href else ""
-            artist_name = self._extract_artist_name(track_link)
+        return connections
 
-            connection = {
-                "track": track_name,
-                "artist": artist_name,
-                "url": track_url,
-            }
+    async def _add_youtube_urls(self, connections: List[Dict]):
+        """
+        Add YouTube links to connections in place, fetching all tracks at once.
 
-            # Fetch YouTube link if requested
-            if include_youtube and track_url:
-                try:
-                    html = await self._fetch_page(track_url)
-                    soup = BeautifulSoup(html, "lxml")
+        Args:
+            connections: Connections as returned by _extract_connections
+        """
+        with_url = [c for c in connections if c["url"]]
+        youtube_urls = await asyncio.gather(
+            *(self._fetch_youtube_url(c["url"]) for c in with_url)
+        )
+        for connection, youtube_url in zip(with_url, youtube_urls):
+            if youtube_url:
+                connection["youtube_url"] = youtube_url
 
-                    # WhoSampled uses data-id attribute for YouTube video IDs
-                    youtube_embed = soup.select_one(
-                        "div.embed-placeholder[data-id], div.youtube-placeholder[data-id]"
-                    )
-                    if youtube_embed:
-                        video_id = youtube_embed.get("data-id", "")
-                        if video_id:
-                            connection["youtube_url"] = f"https://youtu.be/{video_id}"
-                except Exception as e:
-                    print(f"Error fetching YouTube link for {track_url}: {e}")
+    async def _fetch_youtube_url(self, track_url: str) -> Optional[str]:
+        """
+        Fetch the YouTube link embedded on a track page.
 
-            connections.append(connection)
+        Args:
+            track_url: URL of the track page
 
-        return connections
+        Returns:
+            YouTube URL, or None if not found or the fetch failed
+        """
+        try:
+            soup = await self._fetch_page(track_url, wait_for=self.TRACK_READY_SELECTOR)
+            video_id = self._parse_youtube_id(soup)
+            if video_id:
+                return f"https://youtu.be/{video_id}"
+        except Exception as e:
+            print(f"Error fetching YouTube link for {track_url}: {e}", file=sys.stderr)
+
+        return None
+
+    def _parse_youtube_id(self, soup) -> Optional[str]:
+        """
+        Parse the YouTube video ID from a track page.
+
+        Args:
+            soup: BeautifulSoup track page
+
+        Returns:
+            YouTube video ID, or None if the page has no embed
+        """
+        # WhoSampled uses data-id attribute for YouTube video IDs
+        youtube_embed = _SEL_YOUTUBE_EMBED.select_one(soup)
+        if youtube_embed:
+            return youtube_embed.get("data-id", "") or None
+        return None
 
     async def aclose(self):
-        """Close the browser and playwright."""
+        """Close the HTTP session, browser context, browser and playwright."""
+        if self._http:
+            await self._http.close()
+        if self.context:
+            await self.context.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
+        self._http = None
+        self.context = None
+        self.browser = None
+        self.playwright = None
         self._initialized = False
 
     def close(self):
         """Synchronous close wrapper."""
-        import asyncio
-
         try:
             loop = asyncio.get_event_loop()
             if loop.is_running():
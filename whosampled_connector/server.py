@@ -1,12 +1,41 @@
+import os
 import sys
-import json
+import atexit
+import select
 import asyncio
-import nest_asyncio
+import inspect
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # Use relative import to successfully find scraper.py inside the package
 from .scraper import WhoSampledScraper
+from .cache import disk_cached, get_or_compute, memory_cached, normalize_query
 
-# Apply patch for nested event loops (needed for synchronous loop calling async functions)
-nest_asyncio.apply()
+try:
+    # libuv-based loop with lower per-await overhead, where available
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
+
+# A single event loop runs in a background thread for the life of the process,
+# so tool calls don't create and tear down a new loop on every request.
+_LOOP = _new_event_loop()
+threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+
+
+def _run(coro):
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+# A track's YouTube video essentially never changes, so it is cached much longer
+# than its connection lists
+YOUTUBE_ID_TTL = 30 * 86400
+# Tracks without a video are cached too, so they aren't looked up again on
+# every request, but for less time in case one is added
+NO_YOUTUBE_ID_TTL = 86400
+_NO_YOUTUBE_ID = ""
 
 # --- MCP Tool Implementations ---
 
@@ -14,6 +43,29 @@ nest_asyncio.apply()
 # Using default headless=True now that we resolved the TypeError
 SCRAPER = WhoSampledScraper()
 
+
+@atexit.register
+def _shutdown():
+    """Close the shared browser and stop the background loop when the process exits."""
+    try:
+        asyncio.run_coroutine_threadsafe(SCRAPER.aclose(), _LOOP).result(timeout=10)
+    except Exception:
+        pass
+    _LOOP.call_soon_threadsafe(_LOOP.stop)
+
+
+def _log_prewarm(future):
+    """Report the outcome of the browser pre-warm on stderr."""
+    error = future.exception()
+    if error:
+        sys.stderr.write(f"Browser pre-warm failed: {error}\n")
+    else:
+        sys.stderr.write("Browser warm\n")
+    sys.stderr.flush()
+
+
+@memory_cached(key_func=lambda query=None: normalize_query(query or ""))
+@disk_cached("search", key_func=lambda query=None: normalize_query(query or ""))
 def search_track(query: str):
     """
     Tool 1: Searches for a track and returns basic information and URL.
@@ -23,10 +75,10 @@ def search_track(query: str):
         return {"error": "Query parameter is missing."}
         
     try:
-        # Run the asynchronous search function synchronously
-        result = asyncio.run(SCRAPER.search_track(query))
+        result = _run(SCRAPER.search_track(query))
         
-        if result.get("found"):
+        # The scraper returns None when nothing matches
+        if result:
             return {
                 "title": result["title"],
                 "artist": result["artist"],
@@ -34,7 +86,7 @@ def search_track(query: str):
                 "message": "Track found on WhoSampled. Use get_track_samples or get_track_details_by_url for details."
             }
         else:
-            return {"error": result.get("error", "No track found for the query.")}
+            return {"error": "No track found for the query."}
             
     except Exception as e:
         return {"error": f"An unexpected error occurred during search: {e}"}
@@ -48,53 +100,199 @@ def get_track_samples(query: str, include_youtube: bool = False):
     if not query:
         return {"error": "Query parameter is missing."}
 
-    # 1. Search for the track first to get the URL
-    search_result = search_track(query)
-    if search_result.get("error"):
-        return {"error": f"Search failed: {search_result['error']}"}
-    
-    track_url = search_result['url']
-    track_title = search_result['title']
+    try:
+        # Search and details are fetched in one scraper call
+        details = _lookup_samples(query, include_youtube)
 
-    # 2. Get detailed connections using the URL
-    return get_track_details_by_url(track_url, track_title=track_title, include_youtube=include_youtube)
+        if details.get("error"):
+            return {"error": f"Search failed: {details['error']}"}
+
+        youtube_id = _lookup_youtube_id(details["url"], details) if include_youtube else None
 
+        return _format_details(details, details["url"], details["title"], include_youtube, youtube_id)
 
-def get_track_details_by_url(url: str, track_title: str = "Track", include_youtube: bool = False):
+    except Exception as e:
+        return {"error": f"An unexpected error occurred during samples lookup: {e}"}
+
+
+def get_track_details_by_url(
+    url: str,
+    track_title: str = "Track",
+    include_youtube: bool = False,
+    sampled_by_limit: int = 20,
+    sampled_by_offset: int = 0,
+    stream: bool = False,
+):
     """
     Tool 3: Retrieves samples, covers, and remixes directly from a WhoSampled URL.
-    Input: {"url": "https://www.whosampled.com/track/...", "include_youtube": false}
+    Only a window of the "sampled by" list is returned, since heavily sampled
+    tracks have thousands of entries.
+    With stream, each section is sent as a partial response as soon as it
+    resolves, followed by the full result.
+    Input: {"url": "https://www.whosampled.com/track/...", "include_youtube": false,
+            "sampled_by_limit": 20, "sampled_by_offset": 0, "stream": false}
     """
     if not url or not url.startswith("http"):
         return {"error": "Invalid or missing URL parameter."}
-        
+
+    for name, value in (("sampled_by_limit", sampled_by_limit), ("sampled_by_offset", sampled_by_offset)):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            return {"error": f"{name} must be a non-negative integer."}
+
+    sections = _iter_track_details(url, track_title, include_youtube, sampled_by_limit, sampled_by_offset)
+    if stream:
+        return sections
+    return _drain(sections)
+
+
+def _iter_track_details(url, track_title, include_youtube, sampled_by_limit, sampled_by_offset):
+    """
+    Yields the track's sections as they resolve, then returns the full output.
+    The "sampled by" window and the YouTube ID both depend on the track page,
+    so they are looked up concurrently once it has been fetched.
+    """
     try:
-        # Run the asynchronous details function synchronously
-        details = asyncio.run(SCRAPER.get_track_details(url, include_youtube))
+        details = _lookup_details(url, include_youtube)
         
         if details.get("error"):
             return {"error": details["error"]}
-        
-        output = {
-            "track": track_title,
-            "url": url,
+
+        yield {
             "samples": details["samples"],
-            "sampled_by": details["sampled_by"],
             "covers": details["covers"],
             "remixes": details["remixes"],
         }
-        
-        if include_youtube and details.get("youtube_id"):
-             output["youtube"] = f"https://www.youtube.com/watch?v={details['youtube_id']}"
-        elif include_youtube:
-             output["youtube"] = "YouTube link not found on the WhoSampled page."
 
-        return output
+        resolved = {}
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = {
+                pool.submit(_window_sampled_by, details, sampled_by_limit, sampled_by_offset, include_youtube): "sampled_by",
+            }
+            if include_youtube:
+                futures[pool.submit(_lookup_youtube_id, url, details)] = "youtube_id"
+
+            for future in as_completed(futures):
+                name = futures[future]
+                resolved[name] = future.result()
+                if name == "sampled_by":
+                    yield {"sampled_by": resolved[name]}
+                else:
+                    yield {"youtube": _youtube_link(resolved[name])}
+
+        details = {**details, "sampled_by": resolved["sampled_by"]}
+
+        return _format_details(details, url, track_title, include_youtube, resolved.get("youtube_id"))
         
     except Exception as e:
         return {"error": f"An unexpected error occurred during details lookup: {e}"}
 
 
+def _drain(sections, emit=None):
+    """
+    Runs a section generator to completion, passing each partial section to
+    emit if given, and returns the generator's final result.
+    """
+    while True:
+        try:
+            partial = next(sections)
+        except StopIteration as stop:
+            return stop.value
+        if emit:
+            emit(partial)
+
+
+@disk_cached(
+    "samples",
+    key_func=lambda query, include_youtube: f"{normalize_query(query)}|{include_youtube}",
+)
+def _lookup_samples(query: str, include_youtube: bool):
+    """
+    Searches for a track and fetches its raw details in a single scraper call,
+    cached on disk by normalized query.
+    """
+    return _run(SCRAPER.search_and_fetch_details(query, include_youtube))
+
+
+@disk_cached("details", key_func=lambda url, include_youtube: f"{url}|{include_youtube}")
+def _lookup_details(url: str, include_youtube: bool):
+    """
+    Fetches the raw track details for a URL, cached on disk so repeated lookups
+    skip the browser roundtrip. Kept separate from the tool so the cache key does
+    not depend on the display title. The "sampled by" window is read from the
+    full list when there is one, so its preview is fetched without YouTube links.
+    """
+    return _run(SCRAPER.get_track_details(url, include_youtube, full_sampled_by=True))
+
+
+@disk_cached(
+    "sampled_by",
+    key_func=lambda list_url, limit, offset, include_youtube: f"{list_url}|{limit}|{offset}|{include_youtube}",
+)
+def _lookup_sampled_by(list_url: str, limit: int, offset: int, include_youtube: bool):
+    """
+    Fetches a window of a track's full "sampled by" list, cached on disk.
+    """
+    return _run(SCRAPER.get_sampled_by(list_url, limit, offset, include_youtube))
+
+
+def _window_sampled_by(details: dict, limit: int, offset: int, include_youtube: bool):
+    """
+    Returns the requested window of the "sampled by" list. The track page only
+    shows a preview, so the full list is paged through when the window goes
+    past it, or when YouTube links are wanted, since the preview is fetched
+    without them.
+    """
+    preview = details["sampled_by"]
+    if details.get("sampled_by_url") and (include_youtube or offset + limit > len(preview)):
+        window = _lookup_sampled_by(details["sampled_by_url"], limit, offset, include_youtube)
+        if not window.get("error"):
+            return window["sampled_by"]
+    return preview[offset:offset + limit]
+
+
+def _lookup_youtube_id(url: str, details: dict):
+    """
+    Gets a track's YouTube video ID, cached on disk separately from its
+    connections. The answer read from the already-fetched track page is
+    stored as is, including that there is no video.
+    """
+    youtube_id = get_or_compute(
+        "youtube",
+        url,
+        lambda: details.get("youtube_id") or _NO_YOUTUBE_ID,
+        ttl=lambda youtube_id: YOUTUBE_ID_TTL if youtube_id else NO_YOUTUBE_ID_TTL,
+    )
+    return youtube_id or None
+
+
+def _format_details(details: dict, url: str, track_title: str, include_youtube: bool, youtube_id=None):
+    """
+    Builds the tool output from raw scraper details.
+    """
+    output = {
+        "track": track_title,
+        "url": url,
+        "samples": details["samples"],
+        "sampled_by": details["sampled_by"],
+        "covers": details["covers"],
+        "remixes": details["remixes"],
+    }
+
+    if include_youtube:
+         output["youtube"] = _youtube_link(youtube_id)
+
+    return output
+
+
+def _youtube_link(youtube_id):
+    """
+    Builds the YouTube output field for a video ID, which may be missing.
+    """
+    if youtube_id:
+        return f"https://www.youtube.com/watch?v={youtube_id}"
+    return "YouTube link not found on the WhoSampled page."
+
+
 # Map tool names to their implementation functions
 TOOL_MAP = {
     "search_track": search_track,
@@ -104,6 +302,60 @@ TOOL_MAP = {
 
 # --- Entry Points for Import ---
 
+class _RequestReader:
+    """
+    Reads newline-delimited requests straight from a file descriptor.
+    Lines are framed here rather than by sys.stdin, whose read-ahead buffer
+    would hold requests that already arrived where select() can't see them.
+    """
+
+    def __init__(self, fd):
+        self._fd = fd
+        self._buffer = bytearray()
+
+    def readline(self):
+        """
+        Returns the next line including its newline, or b"" at end of input.
+        """
+        while (end := self._buffer.find(b"\n")) < 0:
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                line = bytes(self._buffer)
+                self._buffer.clear()
+                return line
+            self._buffer += chunk
+        line = bytes(self._buffer[:end + 1])
+        del self._buffer[:end + 1]
+        return line
+
+    def has_pending(self):
+        """
+        Returns True if more input is already buffered or waiting on the fd.
+        """
+        if self._buffer:
+            return True
+        # select() only supports sockets on Windows
+        if sys.platform == "win32":
+            return False
+        try:
+            readable, _, _ = select.select([self._fd], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return bool(readable)
+
+
+def _write_response(response, flush=True):
+    """
+    Writes one JSON response line to stdout as raw bytes.
+    The caller skips flushing while the client has more requests queued, so a
+    burst of pipelined requests is answered with fewer write syscalls.
+    """
+    sys.stdout.buffer.write(orjson.dumps(response))
+    sys.stdout.buffer.write(b"\n")
+    if flush:
+        sys.stdout.buffer.flush()
+
+
 def cli():
     """
     The main loop/CLI entry point that listens for JSON requests on stdin
@@ -113,15 +365,24 @@ def cli():
     sys.stderr.write("WhoSampled MCP Server starting and waiting for client input...\n")
     sys.stderr.flush()
 
+    # Start launching the browser now, so it is ready by the time the first
+    # request arrives on stdin. Set WHOSAMPLED_PREWARM=0 to disable.
+    if os.environ.get("WHOSAMPLED_PREWARM", "1") != "0":
+        asyncio.run_coroutine_threadsafe(
+            SCRAPER._ensure_browser(), _LOOP
+        ).add_done_callback(_log_prewarm)
+
+    reader = _RequestReader(sys.stdin.fileno())
+
     while True:
         try:
             # Read one line (the JSON request) from stdin
-            line = sys.stdin.readline()
+            line = reader.readline()
             if not line:
                 # End of file (stream closed)
                 break
 
-            request = json.loads(line)
+            request = orjson.loads(line)
             tool_name = request.get("tool")
             tool_args = request.get("args", {})
 
@@ -131,22 +392,27 @@ def cli():
                 tool_func = TOOL_MAP[tool_name]
                 # Execute the tool function with arguments
                 result = tool_func(**tool_args)
+                if inspect.isgenerator(result):
+                    # Streaming tools send each section as soon as it resolves
+                    result = _drain(
+                        result,
+                        lambda partial: _write_response({"partial": partial}, flush=True),
+                    )
                 response = {"result": result}
-            
-            # Send the JSON response to stdout
-            sys.stdout.write(json.dumps(response) + "\n")
-            sys.stdout.flush()
-
-        except json.JSONDecodeError:
-            error_msg = {"error": "Invalid JSON input."}
-            sys.stdout.write(json.dumps(error_msg) + "\n")
-            sys.stdout.flush()
+
+        except orjson.JSONDecodeError:
+            response = {"error": "Invalid JSON input."}
         except EOFError:
             break
         except Exception as e:
-            error_msg = {"error": f"Server processing error: {e}"}
-            sys.stdout.write(json.dumps(error_msg) + "\n")
-            sys.stdout.flush()
+            response = {"error": f"Server processing error: {e}"}
+
+        # Send the JSON response to stdout, flushing only once no more
+        # requests are waiting
+        _write_response(response, flush=not reader.has_pending())
+
+    # Responses may still be buffered if stdin closed while they were written
+    sys.stdout.buffer.flush()
             
     sys.stderr.write("WhoSampled MCP Server shutting down.\n")
     sys.stderr.flush()